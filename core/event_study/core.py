@@ -32,12 +32,15 @@ import core.event_study.core as cevstcor
 """
 
 
+import dataclasses
 import logging
-from typing import Iterable, Optional, Union
+from typing import Any, Iterable, Optional, Tuple, Union, cast
 
 import numpy as np
 import pandas as pd
+import scipy.linalg as slinalg
 
+import core.signal_processing.ema_smoothing as cspremsm
 import helpers.hdbg as hdbg
 import helpers.hpandas as hpandas
 
@@ -79,6 +82,86 @@ def reindex_event_features(
     return reindexed
 
 
+def compute_smooth_event_features(
+    events: pd.DataFrame,
+    grid_data: pd.DataFrame,
+    tau: float,
+    **kwargs: Any,
+) -> pd.DataFrame:
+    """
+    Align `events` with `grid_data` and smooth them with a kernel.
+
+    This is equivalent to
+    ```
+    aligned_events = reindex_event_features(events, grid_data)
+    event_signal = compute_smooth_moving_average(aligned_events.fillna(0), tau)
+    ```
+    but the events are scattered directly onto a zero-filled buffer, without
+    materializing the reindexed and the filled dataframes.
+
+    :param tau: as in `compute_smooth_moving_average()`
+    :param kwargs: forwarded to `compute_smooth_moving_average()`
+    :return: dataframe with
+        - cols as in `events`
+        - index like `grid_data.index`
+    """
+    # Find the grid positions of the events, dropping the ones not on the grid.
+    event_positions = grid_data.index.get_indexer(events.index)
+    found = event_positions >= 0
+    # Scatter the event features onto the grid, filling the rest (and the
+    # missing features) with zeros.
+    event_values = events.to_numpy(dtype=float)[found]
+    values = np.zeros((grid_data.shape[0], events.shape[1]))
+    values[event_positions[found]] = np.where(
+        np.isnan(event_values), 0.0, event_values
+    )
+    aligned_events = pd.DataFrame(
+        values, index=grid_data.index, columns=events.columns
+    )
+    event_signal = cspremsm.compute_smooth_moving_average(
+        aligned_events, tau, **kwargs
+    )
+    return event_signal
+
+
+@dataclasses.dataclass(frozen=True)
+class EventStudyContext:
+    """
+    Alignment of events on a data grid.
+
+    Building the alignment requires validating and hashing both indices, so
+    it is worth computing it once with `build_event_study_context()` and
+    passing it to `build_local_timeseries()` when the same events and grid
+    are processed multiple times (e.g., sweeping over kernel parameters).
+    """
+
+    # Datetimes of the events.
+    events_index: pd.Index
+    # Datetimes of the data grid.
+    grid_index: pd.Index
+    # Positions of the events in `grid_index` (-1 for events not on the grid).
+    event_positions: np.ndarray
+
+
+def build_event_study_context(
+    events_index: pd.Index, grid_index: pd.Index
+) -> EventStudyContext:
+    """
+    Locate the events on the data grid.
+
+    :param events_index: index of the events, like `events.index` in
+        `build_local_timeseries()`
+    :param grid_index: index of the tabular data, like `grid_data.index` in
+        `build_local_timeseries()`
+    :return: alignment of the events on the grid
+    """
+    hpandas.dassert_strictly_increasing_index(events_index)
+    hpandas.dassert_strictly_increasing_index(grid_index)
+    event_positions = _get_positions_in_sorted_index(grid_index, events_index)
+    context = EventStudyContext(events_index, grid_index, event_positions)
+    return context
+
+
 # #############################################################################
 # Local time series
 # #############################################################################
@@ -90,6 +173,7 @@ def build_local_timeseries(
     relative_grid_indices: Iterable[int],
     freq: Optional[Union[pd.DateOffset, pd.Timedelta, str]] = None,
     info: Optional[dict] = None,
+    context: Optional[EventStudyContext] = None,
 ) -> pd.DataFrame:
     """
     Construct relative time series of `grid_data` around each event.
@@ -108,42 +192,74 @@ def build_local_timeseries(
         of "0", e.g., [-2, -1, 0, 1] denotes t_{-2} < t_{-1} < t_0 < t_1,
         where "t_0" is the event time.
     :param freq: as in pandas `shift`
+    :param context: alignment of `events` on `grid_data` as returned by
+        `build_event_study_context()`; if `None` it is computed
     :return: multiindexed dataframe
         -   level 0: relative grid indices
         -   level 1: event time (e.g., "t_0") for each event
                 Note that the event time needs to be adjusted by
                 relative_grid_index grid points in order to obtain the data
                 timestamps
-        -   cols: same as grid_data cols
+        -   cols: same as grid_data cols, with float64 values
     """
     # Enforce assumptions on inputs.
     hdbg.dassert_isinstance(events, pd.DataFrame)
     hdbg.dassert_isinstance(grid_data, pd.DataFrame)
-    hpandas.dassert_strictly_increasing_index(events.index)
-    hpandas.dassert_strictly_increasing_index(grid_data.index)
-    # Make `relative_grid_indices` a sorted list.
-    if not isinstance(relative_grid_indices, list):
-        relative_grid_indices = list(relative_grid_indices)
+    # Locate the events on the grid once, so that each relative grid index
+    # only requires integer arithmetic on positions.
+    if context is None:
+        context = build_event_study_context(events.index, grid_data.index)
+    else:
+        hdbg.dassert_isinstance(context, EventStudyContext)
+        hdbg.dassert(context.events_index.equals(events.index))
+        hdbg.dassert(context.grid_index.equals(grid_data.index))
+    event_positions = context.event_positions
+    # Make `relative_grid_indices` a sorted list without duplicates.
+    relative_grid_indices = sorted(set(relative_grid_indices))
     hdbg.dassert(relative_grid_indices)
-    relative_grid_indices.sort()
-    # Gather the data and, if requested, info.
-    relative_data = {}
+    # Compute the positions of the data and, if requested, info.
+    positions = []
+    found = []
     for idx in relative_grid_indices:
+        # Allocate the info for `idx` only if requested.
+        info_for_idx = None
         if info is not None:
-            info_for_idx = {}
-        else:
-            info_for_idx = None
+            info_for_idx = info[idx] = {}
         # Switch sign of `idx` since a pandas period of `n` selects t_{-n}.
-        data_at_idx = _shift_and_select(
-            events.index, grid_data, -idx, freq, info_for_idx
+        positions_at_idx, found_at_idx = _get_shifted_positions(
+            event_positions,
+            events.index,
+            grid_data.index,
+            -idx,
+            freq,
+            info_for_idx,
         )
-        #
-        if info is not None:
-            info[idx] = info_for_idx
-        relative_data[idx] = data_at_idx
-    # Turn the data dictionary into a multiindexed dataframe.
-    df = pd.concat(relative_data)
-    hpandas.dassert_strictly_increasing_index(df)
+        positions.append(positions_at_idx)
+        found.append(found_at_idx)
+    # Gather the data for all the relative grid indices at once, instead of
+    # concatenating one dataframe per relative grid index.
+    found = np.stack(found)
+    relative_idxs, event_idxs = np.nonzero(found)
+    positions = np.concatenate(positions)
+    # Positions falling outside the grid correspond to the NaNs introduced by
+    # pandas `shift`.
+    is_in_grid = (positions >= 0) & (positions < grid_data.shape[0])
+    df = grid_data.iloc[np.where(is_in_grid, positions, 0)]
+    df.index = pd.MultiIndex.from_arrays(
+        [
+            np.array(relative_grid_indices)[relative_idxs],
+            events.index[event_idxs],
+        ]
+    )
+    if not is_in_grid.all():
+        df = df.where(pd.Series(is_in_grid, index=df.index), axis=0)
+    # Return floats regardless of whether some data points are missing, which
+    # would otherwise decide if integer columns are upcast.
+    df = df.astype(np.float64)
+    # The index of `df` is strictly increasing by construction, since
+    # `relative_grid_indices` is sorted without duplicates and, for each of
+    # them, events are selected in the order of the strictly increasing
+    # `events.index`.
     return df
 
 
@@ -166,55 +282,96 @@ def unwrap_local_timeseries(
         - cols as in local_ts
         - index like grid_data.index
     """
-    relative_times = local_ts.index.unique(level=0)
-    df_list = []
-    for time in relative_times:
-        # Grab df at time.
-        local_df = local_ts.loc[time]
-        # Reindex according to grid_data. This is important for getting adjacent
-        # grid point times. NaNs used datetimes outside of local_df.index.
-        reindexed = local_df.reindex(index=grid_data.index)
-        # Undo time shift used to generate the local time series.
-        shifted = reindexed.shift(time)
-        #
-        df_list.append(shifted.dropna(how="all"))
-    # Concatenate the unwrapped local time series.
-    df = pd.concat(df_list)
-    # Handle overlaps by taking mean (respects response variables).
-    # This ensures that the resulting index is unique
-    df_mean = df.groupby(by=lambda x: x).mean()
-    # Reindex according to grid_data.
-    df_reindexed = df_mean.reindex(index=grid_data.index)
+    # Compute the grid position that each row of `local_ts` maps back to, i.e.,
+    # undo the time shift used to generate the local time series.
+    relative_times = local_ts.index.get_level_values(0).to_numpy()
+    event_positions = grid_data.index.get_indexer(
+        local_ts.index.get_level_values(1)
+    )
+    positions = event_positions + relative_times
+    # Keep only the rows that map onto the grid and have some data.
+    values = local_ts.to_numpy(dtype=float)
+    is_nan = np.isnan(values)
+    n_grid = grid_data.shape[0]
+    mask = (
+        (event_positions >= 0)
+        & (positions >= 0)
+        & (positions < n_grid)
+        & ~is_nan.all(axis=1)
+    )
+    positions = positions[mask]
+    values = values[mask]
+    is_nan = is_nan[mask]
+    # Handle overlaps by taking mean (respects response variables), skipping
+    # NaNs. This ensures that the resulting index is unique.
+    sums = np.empty((n_grid, values.shape[1]))
+    counts = np.empty((n_grid, values.shape[1]))
+    for col in range(values.shape[1]):
+        sums[:, col] = np.bincount(
+            positions,
+            weights=np.where(is_nan[:, col], 0.0, values[:, col]),
+            minlength=n_grid,
+        )
+        counts[:, col] = np.bincount(
+            positions, weights=~is_nan[:, col], minlength=n_grid
+        )
+    # Grid points without data get NaN.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / counts
+    df_reindexed = pd.DataFrame(
+        means, index=grid_data.index, columns=local_ts.columns
+    )
     #
     hpandas.dassert_strictly_increasing_index(df_reindexed)
     return df_reindexed
 
 
-def _shift_and_select(
+def _get_shifted_positions(
+    event_positions: np.ndarray,
     idx: pd.Index,
-    grid_data: pd.DataFrame,
+    grid_index: pd.Index,
     periods: int,
     freq: Optional[Union[pd.DateOffset, pd.Timedelta, str]] = None,
     info: Optional[dict] = None,
-) -> pd.DataFrame:
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Shift by `periods` and select `idx`.
+    Shift by `periods` and locate `idx` on the grid.
 
     This private helper encapsulates and isolates time-shifting behavior.
 
+    The result describes the rows obtained by shifting the grid data with
+    pandas `shift` and selecting `idx`, without copying any grid data.
+
+    :param event_positions: positions of `idx` in `grid_index` as returned by
+        `get_indexer()` (i.e., -1 for datetimes not on the grid)
     :param idx: reference index (e.g., of datetimes of events)
-    :param grid_data: tabular data
+    :param grid_index: index of the tabular data
     :param periods: as in pandas `shift` functions
     :param freq: as in pandas `shift` functions
     :param info: optional empty dict-like object to be populated with stats
         about the operation performed
+    :return:
+        - positions in `grid_index` of the data for the elements of `idx`
+          found in the shifted index; positions outside of the grid
+          correspond to the NaNs introduced by pandas `shift`
+        - boolean mask of the elements of `idx` found in the shifted index
     """
-    # Shift.
-    shifted_grid_data = grid_data.shift(periods, freq)
-    # Select.
-    intersection = idx.intersection(shifted_grid_data.index)
+    if freq is None:
+        # Shifting the data by `periods` grid points keeps the grid index, so
+        # only events on the grid are selected and the value for an event at
+        # position `p` comes from position `p - periods`.
+        found = event_positions >= 0
+        positions = event_positions[found] - periods
+    else:
+        # Shifting the index by `periods * freq` means that the value for an
+        # event at time `t` comes from time `t - periods * freq`.
+        positions = _get_positions_in_sorted_index(
+            grid_index, idx.shift(-periods, freq)
+        )
+        found = positions >= 0
+        positions = positions[found]
+    intersection = idx[found]
     hdbg.dassert(not intersection.empty)
-    selected = shifted_grid_data.loc[intersection]
     # Maybe add info.
     if info is not None:
         hdbg.dassert_isinstance(info, dict)
@@ -225,7 +382,42 @@ def _shift_and_select(
         info["periods"] = periods
         if freq is not None:
             info["freq"] = freq
-    return selected
+    return positions, found
+
+
+def _get_positions_in_sorted_index(
+    index: pd.Index, target: pd.Index
+) -> np.ndarray:
+    """
+    Locate `target` in the strictly increasing `index`.
+
+    This is equivalent to `index.get_indexer(target)`, but for datetime
+    indices it relies on binary search on the underlying integers instead of
+    hashing `index`.
+
+    :return: positions of the elements of `target` in `index` (-1 for the
+        elements not in `index`)
+    """
+    if not (
+        isinstance(index, pd.DatetimeIndex)
+        and isinstance(target, pd.DatetimeIndex)
+        and index.dtype == target.dtype
+    ):
+        positions = index.get_indexer(target)
+        return cast(np.ndarray, positions)
+    if index.empty:
+        positions = np.full(target.size, -1, dtype=np.intp)
+        return cast(np.ndarray, positions)
+    index_values = index.asi8
+    target_values = target.asi8
+    positions = np.searchsorted(index_values, target_values)
+    # Clip the positions past the end, since those elements are not found.
+    found = (
+        index_values[np.minimum(positions, index_values.size - 1)]
+        == target_values
+    )
+    positions = np.where(found, positions, -1)
+    return cast(np.ndarray, positions)
 
 
 # #############################################################################
@@ -233,6 +425,12 @@ def _shift_and_select(
 # #############################################################################
 
 
+# Maximum condition number of X'X to solve the normal equations with a
+# Cholesky factorization. The condition number of X'X is the square of the one
+# of X, so above this threshold `lstsq` on X is more accurate.
+_MAX_XTX_CONDITION_NUMBER = 1 / np.sqrt(np.finfo(float).eps)
+
+
 # TODO(Paul): Move to `statistics.py`.
 def regression(x: pd.DataFrame, y: pd.Series, info: Optional[dict] = None):
     """
@@ -243,35 +441,58 @@ def regression(x: pd.DataFrame, y: pd.Series, info: Optional[dict] = None):
     Returns beta_hat along with beta_hat_covar and z-scores for the hypothesis
     that a beta_j = 0.
     """
+    # Work on NumPy arrays, to avoid pandas indexing and alignment.
+    x_values = x.to_numpy()
+    y_values = y.to_numpy()
+    # Filter NaNs. Boolean indexing returns contiguous copies.
+    nan_filter = ~np.isnan(y_values)
+    x_values = x_values[nan_filter]
+    y_values = y_values[nan_filter]
     # Determine number of non-NaN y-values.
-    nan_filter = ~np.isnan(y)
-    nobs = np.count_nonzero(nan_filter)
-    # Filter NaNs.
-    x = x[nan_filter]
-    y = y[nan_filter]
-    y_mean = np.mean(y)
+    nobs = y_values.shape[0]
+    y_mean = y_values.mean()
     # Compute total sum of squares.
-    tss = (y - y_mean).dot(y - y_mean)
-    # Perform linear regression (estimate \beta).
-    regress = np.linalg.lstsq(x, y, rcond=None)
-    beta_hat = regress[0]
+    y_demeaned = y_values - y_mean
+    tss = y_demeaned @ y_demeaned
     # Ensure full rank.
-    hdbg.dassert_eq(regress[2], x.shape[1])
-    # Extract residual sum of squares.
-    rss = np.asscalar(regress[1])
-    # Compute r^2.
-    r_sq = 1 - rss / tss
-    # Estimate variance sigma_hat_sq.
-    xtx_inv = np.linalg.inv((x.transpose().dot(x)))
-    sigma_hat_sq = rss / (nobs - x.shape[1])
-    # Estimate covariance of \beta.
-    beta_hat_covar = xtx_inv * sigma_hat_sq
-    # Z-score \beta coefficients (e.g., for hypothesis testing).
-    beta_hat_z_score = beta_hat / np.sqrt(sigma_hat_sq * np.diagonal(xtx_inv))
+    hdbg.dassert_eq(np.linalg.matrix_rank(x_values), x_values.shape[1])
+    # Perform linear regression (estimate \beta). If X'X is well-conditioned,
+    # solve the normal equations with a Cholesky factorization X'X = L L',
+    # which is reused below for the inference statistics.
+    xtx = x_values.T @ x_values
+    use_cholesky = np.linalg.cond(xtx) < _MAX_XTX_CONDITION_NUMBER
+    if use_cholesky:
+        xtx_cho = slinalg.cho_factor(xtx, lower=True)
+        beta_hat = slinalg.cho_solve(xtx_cho, x_values.T @ y_values)
+    else:
+        beta_hat = np.linalg.lstsq(x_values, y_values, rcond=None)[0]
+    # Calculate predicted values.
+    y_hat = x_values @ beta_hat
+    # Compute residual sum of squares.
+    resid = y_values - y_hat
+    rss = resid @ resid
     # Maybe add info.
     if info is not None:
         hdbg.dassert_isinstance(info, dict)
         hdbg.dassert(not info)
+        # Compute r^2.
+        r_sq = 1 - rss / tss
+        # Estimate variance sigma_hat_sq.
+        sigma_hat_sq = rss / (nobs - x.shape[1])
+        if use_cholesky:
+            # Compute (X'X)^{-1} = L^{-T} L^{-1} from the triangular inverse of
+            # the Cholesky factor, instead of inverting X'X.
+            xtx_cho_inv = slinalg.solve_triangular(
+                xtx_cho[0], np.eye(x_values.shape[1]), lower=True
+            )
+            xtx_inv = xtx_cho_inv.T @ xtx_cho_inv
+        else:
+            xtx_inv = np.linalg.inv(xtx)
+        # Estimate covariance of \beta.
+        beta_hat_covar = xtx_inv * sigma_hat_sq
+        # Z-score \beta coefficients (e.g., for hypothesis testing).
+        beta_hat_z_score = beta_hat / np.sqrt(sigma_hat_sq * np.diagonal(xtx_inv))
+        #
         info["nobs (resp)=%d"] = nobs
         info["y_mean=%f"] = y_mean
         info["tss=%f"] = tss
@@ -281,6 +502,4 @@ def regression(x: pd.DataFrame, y: pd.Series, info: Optional[dict] = None):
         info["sigma_hat_sq=%s"] = sigma_hat_sq
         info["beta_hat_covar=%s"] = np.array2string(beta_hat_covar)
         info["beta_hat_z_score=%s"] = np.array2string(beta_hat_z_score)
-    # Calculate predicted values
-    y_hat = np.matmul(x.values, beta_hat)
-    return pd.Series(data=y_hat, index=y.index)
+    return pd.Series(data=y_hat, index=y.index[nan_filter])
@@ -5,6 +5,7 @@ import numpy as np
 import pandas as pd
 
 import core.event_study as esf
+import core.signal_processing as csigproc
 import helpers.hunit_test as hunitest
 
 _LOG = logging.getLogger(__name__)
@@ -99,6 +100,48 @@ class TestBuildLocalTimeseries(hunitest.TestCase):
         str_info = str(info).replace("None", f"'{freq}'")
         self.check_string(f"local_ts:\n{local_ts.to_string()}\ninfo:\n{str_info}")
 
+    def test_context1(self) -> None:
+        """
+        Check that reusing a precomputed context gives the same result.
+        """
+        np.random.seed(42)
+        n_periods = 10
+        freq = "T"
+        start_date = pd.Timestamp("2009-09-29 10:00:00")
+        idx = pd.date_range(start_date, periods=n_periods, freq=freq)
+        events = pd.DataFrame(data={"ind": 1}, index=idx)
+        grid_idx = pd.date_range(
+            start_date - pd.Timedelta(f"50{freq}"),
+            freq=freq,
+            periods=n_periods + 100,
+        )
+        grid_data = pd.DataFrame(np.random.randn(len(grid_idx)), index=grid_idx)
+        context = esf.build_event_study_context(events.index, grid_data.index)
+        for relative_grid_indices in [range(-3, 3), [-10, 0, 14]]:
+            expected = esf.build_local_timeseries(
+                events, grid_data, relative_grid_indices
+            )
+            actual = esf.build_local_timeseries(
+                events, grid_data, relative_grid_indices, context=context
+            )
+            pd.testing.assert_frame_equal(actual, expected)
+
+    def test_integer_data1(self) -> None:
+        """
+        Check that integer data is returned as floats, with or without NaNs.
+        """
+        n_periods = 10
+        freq = "T"
+        start_date = pd.Timestamp("2009-09-29 10:00:00")
+        idx = pd.date_range(start_date, periods=n_periods, freq=freq)
+        events = pd.DataFrame(data={"ind": 1}, index=idx[2:4])
+        grid_data = pd.DataFrame({"a": np.arange(n_periods)}, index=idx)
+        for relative_grid_indices in [[-1, 0, 1], [-5, 0]]:
+            local_ts = esf.build_local_timeseries(
+                events, grid_data, relative_grid_indices
+            )
+            self.assertEqual(local_ts["a"].dtype, np.float64)
+
 
 class TestUnwrapLocalTimeseries(hunitest.TestCase):
     def test_daily1(self) -> None:
@@ -126,3 +169,78 @@ class TestUnwrapLocalTimeseries(hunitest.TestCase):
         grid_data = pd.DataFrame(np.random.randn(n_periods), index=timestamps)
         unwrapped = esf.unwrap_local_timeseries(local_ts, grid_data)
         self.check_string(unwrapped.to_string())
+
+
+class TestComputeSmoothEventFeatures(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check that the result matches reindexing, filling, and smoothing.
+        """
+        np.random.seed(42)
+        freq = "T"
+        start_date = pd.Timestamp("2009-09-29 10:00:00")
+        grid_idx = pd.date_range(start_date, periods=50, freq=freq)
+        grid_data = pd.DataFrame(np.random.randn(50), index=grid_idx)
+        # Include an event off the grid and an event with a NaN feature.
+        events_idx = grid_idx[[3, 10, 11, 30]].append(
+            pd.DatetimeIndex([grid_idx[-1] + pd.Timedelta(f"1{freq}")])
+        )
+        events = pd.DataFrame(
+            {"ind": 1.0, "x": [0.5, np.nan, -1.0, 2.0, 3.0]}, index=events_idx
+        )
+        tau = 4
+        actual = esf.compute_smooth_event_features(
+            events, grid_data, tau, max_depth=2
+        )
+        aligned_events = esf.reindex_event_features(events, grid_data)
+        expected = csigproc.compute_smooth_moving_average(
+            aligned_events.fillna(0), tau, max_depth=2
+        )
+        pd.testing.assert_frame_equal(actual, expected)
+
+
+class TestRegression(hunitest.TestCase):
+    def test1(self) -> None:
+        np.random.seed(42)
+        n_periods = 20
+        idx = pd.date_range("2009-09-29 10:00:00", periods=n_periods, freq="T")
+        x = pd.DataFrame(
+            {"const": 1.0, "x1": np.random.randn(n_periods)}, index=idx
+        )
+        y = 0.5 + 2 * x["x1"] + 0.1 * np.random.randn(n_periods)
+        y.iloc[[3, 7]] = np.nan
+        info: collections.OrderedDict = collections.OrderedDict()
+        y_hat = esf.regression(x, y, info=info)
+        # Round floats to make the output robust to numerical noise.
+        str_info = "\n".join(
+            k % (round(v, 6) if isinstance(v, float) else v)
+            for k, v in info.items()
+        )
+        self.check_string(f"y_hat:\n{y_hat.to_string()}\ninfo:\n{str_info}")
+
+    def test_rank_deficient1(self) -> None:
+        """
+        Check that collinear regressors are rejected.
+        """
+        np.random.seed(42)
+        n_periods = 20
+        x1 = np.random.randn(n_periods)
+        x = pd.DataFrame({"const": 1.0, "x1": x1, "x2": 2 * x1 + 1})
+        y = pd.Series(x1 + 0.1 * np.random.randn(n_periods))
+        with self.assertRaises(AssertionError):
+            esf.regression(x, y)
+
+    def test_ill_conditioned1(self) -> None:
+        """
+        Check the fit with nearly collinear regressors.
+        """
+        np.random.seed(42)
+        n_periods = 20
+        x1 = np.random.randn(n_periods)
+        x2 = 2 * x1 + 1 + 1e-6 * np.random.randn(n_periods)
+        x = pd.DataFrame({"const": 1.0, "x1": x1, "x2": x2})
+        y = pd.Series(x1 + x2 + 0.1 * np.random.randn(n_periods))
+        info: collections.OrderedDict = collections.OrderedDict()
+        y_hat = esf.regression(x, y, info=info)
+        beta_hat = np.linalg.lstsq(x.to_numpy(), y.to_numpy(), rcond=None)[0]
+        np.testing.assert_allclose(y_hat.to_numpy(), x.to_numpy() @ beta_hat)
@@ -1,3 +1,4 @@
+import functools
 import logging
 
 import numpy as np
@@ -80,52 +81,88 @@ class TestComputeMoments(hunitest.TestCase):
         return series
 
 
+@functools.lru_cache(maxsize=None)
+def _get_df_with_special_values(seed: int) -> pd.DataFrame:
+    """
+    Build a random dataframe with a known number of NaNs, infs and zeros.
+
+    The special values are placed in disjoint random positions, so that their
+    counts are exact.
+    """
+    nrows = 15
+    ncols = 5
+    num_nans = 15
+    num_infs = 5
+    num_zeros = 20
+    #
+    rng = np.random.default_rng(seed)
+    mat = rng.standard_normal((nrows, ncols))
+    # Draw the positions of all the special values with a single shuffle.
+    perm = rng.permutation(mat.size)
+    end_nans = num_nans
+    end_infs = end_nans + num_infs
+    end_neg_infs = end_infs + num_infs
+    end_zeros = end_neg_infs + num_zeros
+    mat.flat[perm[:end_nans]] = np.nan
+    mat.flat[perm[end_nans:end_infs]] = np.inf
+    mat.flat[perm[end_infs:end_neg_infs]] = -np.inf
+    mat.flat[perm[end_neg_infs:end_zeros]] = 0
+    #
+    index = pd.date_range(start="01-04-2018", periods=nrows, freq="30T")
+    df = pd.DataFrame(data=mat, index=index)
+    return df
+
+
 class TestComputeFracZero(hunitest.TestCase):
     def test1(self) -> None:
-        data = [0.466667, 0.2, 0.13333, 0.2, 0.33333]
+        data = [0.333333, 0.333333, 0.133333, 0.266667, 0.266667]
         index = [0, 1, 2, 3, 4]
         expected = pd.Series(data=data, index=index)
-        actual = cstadesc.compute_frac_zero(self._get_df(seed=1))
+        actual = cstadesc.compute_frac_zero(_get_df_with_special_values(seed=1))
         pd.testing.assert_series_equal(actual, expected, check_less_precise=3)
 
     def test2(self) -> None:
         data = [
             0.4,
-            0.0,
             0.2,
             0.4,
-            0.4,
+            0.6,
             0.2,
             0.4,
             0.0,
-            0.6,
-            0.4,
-            0.6,
-            0.2,
             0.0,
+            0.2,
             0.0,
             0.2,
+            0.0,
+            0.4,
+            0.6,
+            0.4,
         ]
         index = pd.date_range(start="1-04-2018", periods=15, freq="30T")
         expected = pd.Series(data=data, index=index)
-        actual = cstadesc.compute_frac_zero(self._get_df(seed=1), axis=1)
+        actual = cstadesc.compute_frac_zero(
+            _get_df_with_special_values(seed=1), axis=1
+        )
         pd.testing.assert_series_equal(actual, expected, check_less_precise=3)
 
     def test3(self) -> None:
         # Equals 20 / 75 = num_zeros / num_points.
         expected = 0.266666
-        actual = cstadesc.compute_frac_zero(self._get_df(seed=1), axis=None)
+        actual = cstadesc.compute_frac_zero(
+            _get_df_with_special_values(seed=1), axis=None
+        )
         np.testing.assert_almost_equal(actual, expected, decimal=3)
 
     def test4(self) -> None:
-        series = self._get_df(seed=1)[0]
-        expected = 0.466667
+        series = _get_df_with_special_values(seed=1)[0]
+        expected = 0.333333
         actual = cstadesc.compute_frac_zero(series)
         np.testing.assert_almost_equal(actual, expected, decimal=3)
 
     def test5(self) -> None:
-        series = self._get_df(seed=1)[0]
-        expected = 0.466667
+        series = _get_df_with_special_values(seed=1)[0]
+        expected = 0.333333
         actual = cstadesc.compute_frac_zero(series, axis=0)
         np.testing.assert_almost_equal(actual, expected, decimal=3)
 
@@ -134,72 +171,57 @@ class TestComputeFracZero(hunitest.TestCase):
         series = pd.Series([])
         cstadesc.compute_frac_zero(series)
 
-    @staticmethod
-    def _get_df(seed: int) -> pd.DataFrame:
-        nrows = 15
-        ncols = 5
-        num_nans = 15
-        num_infs = 5
-        num_zeros = 20
-        #
-        np.random.seed(seed=seed)
-        mat = np.random.randn(nrows, ncols)
-        mat.ravel()[np.random.choice(mat.size, num_nans, replace=False)] = np.nan
-        mat.ravel()[np.random.choice(mat.size, num_infs, replace=False)] = np.inf
-        mat.ravel()[np.random.choice(mat.size, num_infs, replace=False)] = -np.inf
-        mat.ravel()[np.random.choice(mat.size, num_zeros, replace=False)] = 0
-        #
-        index = pd.date_range(start="01-04-2018", periods=nrows, freq="30T")
-        df = pd.DataFrame(data=mat, index=index)
-        return df
-
 
 class TestComputeFracNan(hunitest.TestCase):
     def test1(self) -> None:
-        data = [0.4, 0.133333, 0.133333, 0.133333, 0.2]
+        data = [0.266667, 0.133333, 0.266667, 0.133333, 0.2]
         index = [0, 1, 2, 3, 4]
         expected = pd.Series(data=data, index=index)
-        actual = cstadesc.compute_frac_nan(self._get_df(seed=1))
+        actual = cstadesc.compute_frac_nan(_get_df_with_special_values(seed=1))
         pd.testing.assert_series_equal(actual, expected, check_less_precise=3)
 
     def test2(self) -> None:
         data = [
-            0.4,
+            0.2,
+            0.2,
+            0.2,
             0.0,
             0.2,
             0.4,
             0.2,
+            0.4,
             0.2,
             0.2,
             0.0,
             0.4,
             0.2,
-            0.6,
-            0.0,
-            0.0,
             0.0,
             0.2,
         ]
         index = pd.date_range(start="1-04-2018", periods=15, freq="30T")
         expected = pd.Series(data=data, index=index)
-        actual = cstadesc.compute_frac_nan(self._get_df(seed=1), axis=1)
+        actual = cstadesc.compute_frac_nan(
+            _get_df_with_special_values(seed=1), axis=1
+        )
         pd.testing.assert_series_equal(actual, expected, check_less_precise=3)
 
     def test3(self) -> None:
         # Equals 15 / 75 = num_nans / num_points.
         expected = 0.2
-        actual = cstadesc.compute_frac_nan(self._get_df(seed=1), axis=None)
+        actual = cstadesc.compute_frac_nan(
+            _get_df_with_special_values(seed=1), axis=None
+        )
         np.testing.assert_almost_equal(actual, expected, decimal=3)
 
     def test4(self) -> None:
-        series = self._get_df(seed=1)[0]
-        expected = 0.4
+        series = _get_df_with_special_values(seed=1)[0]
+        expected = 0.266667
         actual = cstadesc.compute_frac_nan(series)
         np.testing.assert_almost_equal(actual, expected, decimal=3)
 
     def test5(self) -> None:
-        series = self._get_df(seed=1)[0]
-        expected = 0.4
+        series = _get_df_with_special_values(seed=1)[0]
+        expected = 0.266667
         actual = cstadesc.compute_frac_nan(series, axis=0)
         np.testing.assert_almost_equal(actual, expected, decimal=3)
 
@@ -208,25 +230,6 @@ class TestComputeFracNan(hunitest.TestCase):
         series = pd.Series([])
         cstadesc.compute_frac_nan(series)
 
-    @staticmethod
-    def _get_df(seed: int) -> pd.DataFrame:
-        nrows = 15
-        ncols = 5
-        num_nans = 15
-        num_infs = 5
-        num_zeros = 20
-        #
-        np.random.seed(seed=seed)
-        mat = np.random.randn(nrows, ncols)
-        mat.ravel()[np.random.choice(mat.size, num_infs, replace=False)] = np.inf
-        mat.ravel()[np.random.choice(mat.size, num_infs, replace=False)] = -np.inf
-        mat.ravel()[np.random.choice(mat.size, num_zeros, replace=False)] = 0
-        mat.ravel()[np.random.choice(mat.size, num_nans, replace=False)] = np.nan
-        #
-        index = pd.date_range(start="01-04-2018", periods=nrows, freq="30T")
-        df = pd.DataFrame(data=mat, index=index)
-        return df
-
 
 class TestComputeNumFiniteSamples(hunitest.TestCase):
     @staticmethod
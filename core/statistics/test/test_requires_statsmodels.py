@@ -1,3 +1,4 @@
+import functools
 import logging
 
 import numpy as np
@@ -257,6 +258,12 @@ class TestApplyKpssTest(hunitest.TestCase):
 
     @staticmethod
     def _get_series(seed: int) -> pd.Series:
+        # Return a copy since some tests modify the series in place.
+        return TestApplyKpssTest._get_cached_series(seed).copy()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_cached_series(seed: int) -> pd.Series:
         arparams = np.array([0.75, -0.25])
         maparams = np.array([0.65, 0.35])
         arma_process = carsigen.ArmaProcess(arparams, maparams)
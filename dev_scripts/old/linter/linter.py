@@ -39,13 +39,20 @@ import dev_scripts.old.linter.linter as dsollili
 """
 
 import argparse
-import itertools
+import concurrent.futures
+import functools
+import hashlib
+import io
 import logging
 import os
 import py_compile
 import re
+import shlex
+import shutil
+import subprocess
 import sys
-from typing import Any, List, Tuple, Type
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, cast
 
 import helpers.hdbg as hdbg
 import helpers.hgit as hgit
@@ -107,6 +114,39 @@ def _annotate_output(output: List, executable: str) -> List:
     return output
 
 
+def _system_to_string(cmd: str, abort_on_error: bool) -> Tuple[int, str]:
+    """
+    Execute command "cmd" without a shell, capturing stdout and stderr.
+
+    This is equivalent to `hsystem.system_to_string()` for commands that
+    don't use any shell feature (e.g., pipes or redirections), but it saves
+    starting a shell for each command.
+
+    :return: return code and output of the command
+    """
+    _LOG.debug("> %s", cmd)
+    try:
+        completed = subprocess.run(
+            shlex.split(cmd),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            check=False,
+        )
+        rc = completed.returncode
+        output = completed.stdout.decode("utf-8")
+    except OSError as e:
+        rc = -1
+        output = ""
+        _LOG.error("error=%s", str(e))
+    _LOG.debug("  ==> rc=%s", rc)
+    if abort_on_error and rc != 0:
+        raise RuntimeError(
+            "cmd='%s' failed with rc='%s'\noutput=\n%s" % (cmd, rc, output)
+        )
+    output = output.rstrip("\n")
+    return rc, output
+
+
 def _tee(
     cmd: str, executable: str, abort_on_error: bool
 ) -> Tuple[int, List[str]]:
@@ -116,7 +156,7 @@ def _tee(
     :return: list of strings
     """
     _LOG.debug("cmd=%s executable=%s", cmd, executable)
-    rc, output = hsystem.system_to_string(cmd, abort_on_error=abort_on_error)
+    rc, output = _system_to_string(cmd, abort_on_error=abort_on_error)
     hdbg.dassert_isinstance(output, str)
     output1 = output.split("\n")
     _LOG.debug("output1= (%d)\n'%s'", len(output1), "\n".join(output1))
@@ -127,13 +167,41 @@ def _tee(
     return rc, output2
 
 
+def _quote_file_names(file_names: List[str]) -> str:
+    """
+    Join file names so that `_system_to_string()` splits them back unchanged.
+    """
+    return " ".join(shlex.quote(file_name) for file_name in file_names)
+
+
 # TODO(gp): Move to system_interactions.
+@functools.lru_cache(maxsize=None)
 def _check_exec(tool: str) -> bool:
     """
     :return: True if the executables "tool" can be executed.
     """
-    rc = _system("which %s" % tool, abort_on_error=False)
-    return rc == 0
+    # Look up the executable in-process, instead of running `which`.
+    return shutil.which(tool) is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _find_file_in_git_tree(file_name: str) -> str:
+    """
+    Find the path of a file in the Git tree, searching only once per file.
+    """
+    file_name_out = hgit.find_file_in_git_tree(file_name)
+    return cast(str, file_name_out)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_executable_version(executable: str) -> str:
+    """
+    :return: the version reported by the executable "executable"
+    """
+    _, output = hsystem.system_to_string(
+        executable + " --version", abort_on_error=False
+    )
+    return cast(str, output)
 
 
 # #############################################################################
@@ -141,32 +209,48 @@ def _check_exec(tool: str) -> bool:
 # #############################################################################
 
 
-def _filter_target_files(file_names: List[str]) -> List[str]:
+def _is_target_file(file_name: str) -> bool:
     """
-    Keep only the files that:
+    Return whether a file:
 
-    - have extension .py, .ipynb, .txt or .md.
-    - are not Jupyter checkpoints
-    - are not in tmp dirs
+    - has extension .py, .ipynb, .txt or .md.
+    - is not a Jupyter checkpoint
+    - is not in tmp dirs
     """
-    file_names_out: List[str] = []
-    for file_name in file_names:
-        _, file_ext = os.path.splitext(file_name)
-        # We skip .ipynb since jupytext is part of the main flow.
-        is_valid = file_ext in (".py", ".txt", ".md", ".ipynb")
-        is_valid &= ".ipynb_checkpoints/" not in file_name
-        is_valid &= "dev_scripts/install/conda_envs" not in file_name
-        # Skip requirements.txt.
-        is_valid &= os.path.basename(file_name) != "requirements.txt"
-        # Skip tmp names since we need to run on unit tests.
-        if False:
-            # Skip files in directory starting with "tmp.".
-            is_valid &= "/tmp." not in file_name
-            # Skip files starting with "tmp.".
-            is_valid &= not file_name.startswith("tmp.")
-        if is_valid:
-            file_names_out.append(file_name)
-    return file_names_out
+    _, file_ext = os.path.splitext(file_name)
+    # We skip .ipynb since jupytext is part of the main flow.
+    is_valid = file_ext in (".py", ".txt", ".md", ".ipynb")
+    is_valid &= ".ipynb_checkpoints/" not in file_name
+    is_valid &= "dev_scripts/install/conda_envs" not in file_name
+    # Skip requirements.txt.
+    is_valid &= os.path.basename(file_name) != "requirements.txt"
+    # Skip tmp names since we need to run on unit tests.
+    if False:
+        # Skip files in directory starting with "tmp.".
+        is_valid &= "/tmp." not in file_name
+        # Skip files starting with "tmp.".
+        is_valid &= not file_name.startswith("tmp.")
+    return is_valid
+
+
+def _find_files(dir_name: str) -> List[str]:
+    """
+    Return all the regular files under `dir_name`.
+
+    This is equivalent to `find {dir_name} -type f`, without running a
+    subprocess and parsing its output.
+    """
+    file_names: List[str] = []
+    dir_names = [dir_name]
+    while dir_names:
+        with os.scandir(dir_names.pop()) as entries:
+            for entry in entries:
+                # The type of an entry is usually known without a `stat`.
+                if entry.is_dir(follow_symlinks=False):
+                    dir_names.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    file_names.append(entry.path)
+    return file_names
 
 
 def _get_files(args: argparse.Namespace) -> List[str]:
@@ -204,9 +288,7 @@ def _get_files(args: argparse.Namespace) -> List[str]:
             dir_name = os.path.abspath(dir_name)
             _LOG.info("Looking for all files in '%s'", dir_name)
             hdbg.dassert_path_exists(dir_name)
-            cmd = "find %s -name '*' -type f" % dir_name
-            _, output = hsystem.system_to_string(cmd)
-            file_names = output.split("\n")
+            file_names = _find_files(dir_name)
     # Remove text files used in unit tests.
     file_names = [f for f in file_names if not is_test_input_output_file(f)]
     # Make all paths absolute.
@@ -234,39 +316,44 @@ def _get_files_to_lint(
     Typically files to lint are python and notebooks.
     """
     _LOG.debug("file_names=%s", _list_to_str(file_names))
-    # Keep only actual .py and .ipynb files.
-    file_names = _filter_target_files(file_names)
-    _LOG.debug("file_names=%s", _list_to_str(file_names))
-    # Remove files.
-    if args.skip_py:
-        file_names = [f for f in file_names if not is_py_file(f)]
-    if args.skip_ipynb:
-        file_names = [f for f in file_names if not is_ipynb_file(f)]
+    skip_files = set()
     if args.skip_files:
         hdbg.dassert_isinstance(args.skip_files, list)
-        # TODO(gp): Factor out this code and reuse it in this function.
         _LOG.warning(
             "Skipping %s files, as per user request",
             _list_to_str(args.skip_files),
         )
-        skip_files = args.skip_files
-        skip_files = [os.path.abspath(f) for f in skip_files]
-        skip_files = set(skip_files)
-        file_names_out = [f for f in file_names if f not in skip_files]
-        removed_file_names = list(set(file_names) - set(file_names_out))
+        skip_files = {os.path.abspath(f) for f in args.skip_files}
+    removed_file_names = []
+
+    def _keep(file_name: str) -> bool:
+        # Keep only actual .py and .ipynb files.
+        if not _is_target_file(file_name):
+            return False
+        # Remove files.
+        if args.skip_py and is_py_file(file_name):
+            return False
+        if args.skip_ipynb and is_ipynb_file(file_name):
+            return False
+        if file_name in skip_files:
+            removed_file_names.append(file_name)
+            return False
+        # Keep files.
+        if args.only_py and not (
+            is_py_file(file_name) and not is_paired_jupytext_file(file_name)
+        ):
+            return False
+        if args.only_ipynb and not is_ipynb_file(file_name):
+            return False
+        if args.only_paired_jupytext and not is_paired_jupytext_file(file_name):
+            return False
+        return True
+
+    # Apply all the filters in a single pass.
+    file_names = [f for f in file_names if _keep(f)]
+    if args.skip_files:
+        removed_file_names = hlist.remove_duplicates(removed_file_names)
         _LOG.warning("Removing %s files", _list_to_str(removed_file_names))
-        file_names = file_names_out
-    # Keep files.
-    if args.only_py:
-        file_names = [
-            f
-            for f in file_names
-            if is_py_file(f) and not is_paired_jupytext_file(f)
-        ]
-    if args.only_ipynb:
-        file_names = [f for f in file_names if is_ipynb_file(f)]
-    if args.only_paired_jupytext:
-        file_names = [f for f in file_names if is_paired_jupytext_file(f)]
     #
     _LOG.debug("file_names=(%s) %s", len(file_names), " ".join(file_names))
     if len(file_names) < 1:
@@ -315,6 +402,14 @@ class _Action:
     def __init__(self, executable: str = "") -> None:
         self._executable = executable
 
+    def get_version(self) -> str:
+        """
+        Return the version of the executable used by the action, if any.
+        """
+        if not self._executable:
+            return ""
+        return _get_executable_version(self._executable)
+
     # @abc.abstractmethod
     def check_if_possible(self) -> bool:
         """
@@ -336,10 +431,38 @@ class _Action:
         _dassert_list_of_strings(output)
         return output
 
+    def execute_batch(self, file_names: List[str], pedantic: int) -> List[str]:
+        """
+        Execute the action on multiple files.
+
+        :param file_names: names of the files to process
+        :param pendantic: True if it needs to be run in angry mode
+        :return: list of strings representing the output
+        """
+        for file_name in file_names:
+            hdbg.dassert(file_name)
+            hdbg.dassert_path_exists(file_name)
+        output = self._execute_batch(file_names, pedantic)
+        _dassert_list_of_strings(output)
+        return output
+
     # @abc.abstractmethod
     def _execute(self, file_name: str, pedantic: int) -> List[str]:
         raise NotImplementedError
 
+    def _execute_batch(self, file_names: List[str], pedantic: int) -> List[str]:
+        """
+        Execute the action on one file at a time.
+
+        Actions running an executable override this method to process all the
+        files with a single invocation, amortizing the startup cost of the
+        executable.
+        """
+        output: List[str] = []
+        for file_name in file_names:
+            output.extend(self._execute(file_name, pedantic))
+        return output
+
 
 # #############################################################################
 
@@ -423,6 +546,12 @@ class _CheckFileProperty(_Action):
 # #############################################################################
 
 
+# Whitespaces at the end of each line, excluding the newline.
+_TRAILING_SPACES_REGEX = re.compile(r"[^\S\n]+$", re.MULTILINE)
+# ASCII whitespaces at the end of each line, excluding tabs and newlines.
+_TRAILING_ASCII_SPACES_REGEX = re.compile(rb"[ \x0b\x0c\x1c-\x1f]+(?:\n|\Z)")
+
+
 class _BasicHygiene(_Action):
     def check_if_possible(self) -> bool:
         # We don't need any special executable, so we can always run this action.
@@ -431,32 +560,37 @@ class _BasicHygiene(_Action):
     def _execute(self, file_name: str, pedantic: int) -> List[str]:
         _ = pedantic
         output: List[str] = []
-        # Read file.
-        txt = hio.from_file(file_name).split("\n")
-        # Process file.
-        txt_new: List[str] = []
-        for line in txt:
-            if "\t" in line:
-                msg = (
-                    "Found tabs in %s: please use 4 spaces as per PEP8"
-                    % file_name
-                )
-                _LOG.warning(msg)
-                output.append(msg)
+        # Skip files that are already clean, scanning the raw bytes without
+        # decoding the file. Non-ASCII files and carriage returns, which are
+        # translated when reading the file as text, take the general path.
+        with open(file_name, "rb") as f:
+            data = f.read()
+        if (
+            data.isascii()
+            and b"\t" not in data
+            and b"\r" not in data
+            and not _TRAILING_ASCII_SPACES_REGEX.search(data)
+        ):
+            return output
+        # Decode the file like when reading it as text (e.g., translating the
+        # newlines), without reading it again.
+        txt = io.TextIOWrapper(io.BytesIO(data)).read()
+        # Process the entire file at once, instead of line by line.
+        txt_new = txt
+        if "\t" in txt_new:
+            msg = "Found tabs in %s: please use 4 spaces as per PEP8" % file_name
+            _LOG.warning(msg)
+            output.append(msg)
             # Convert tabs.
-            line = line.replace("\t", " " * 4)
-            # Remove trailing spaces.
-            line = line.rstrip()
-            # dos2unix.
-            line = line.replace("\r\n", "\n")
-            # TODO(gp): Remove empty lines in functions.
-            txt_new.append(line.rstrip("\n"))
-        # Remove whitespaces at the end of file.
-        while txt_new and (txt_new[-1] == "\n"):
-            # While the last item in the list is blank, removes last element.
-            txt_new.pop(-1)
+            txt_new = txt_new.replace("\t", " " * 4)
+        # Remove trailing spaces.
+        txt_new = _TRAILING_SPACES_REGEX.sub("", txt_new)
+        # dos2unix.
+        txt_new = txt_new.replace("\r\n", "\n")
+        # TODO(gp): Remove empty lines in functions.
         # Write.
-        _write_file_back(file_name, txt, txt_new)
+        if txt_new != txt:
+            hio.to_file(file_name, txt_new)
         return output
 
 
@@ -504,14 +638,17 @@ class _Autoflake(_Action):
         return _check_exec(self._executable)
 
     def _execute(self, file_name: str, pedantic: int) -> List[str]:
+        return self._execute_batch([file_name], pedantic)
+
+    def _execute_batch(self, file_names: List[str], pedantic: int) -> List[str]:
         _ = pedantic
-        # Applicable to only python file.
-        if not is_py_file(file_name):
-            _LOG.debug("Skipping file_name='%s'", file_name)
+        # Applicable to only python files.
+        file_names = _select_py_files(file_names)
+        if not file_names:
             return []
         #
         opts = "-i --remove-all-unused-imports --remove-unused-variables"
-        cmd = self._executable + " %s %s" % (opts, file_name)
+        cmd = self._executable + " %s %s" % (opts, _quote_file_names(file_names))
         _, output = _tee(cmd, self._executable, abort_on_error=False)
         return output
 
@@ -547,6 +684,16 @@ class _Yapf(_Action):
 # #############################################################################
 
 
+_BLACK_SKIPPED_LINE_REGEXES = [
+    re.compile(r"^reformatted "),
+    re.compile(r"^All done"),
+    re.compile(
+        r"^\d+ files? (left unchanged|reformatted)"
+        r"(, \d+ files? (left unchanged|reformatted))*\.$"
+    ),
+]
+
+
 class _Black(_Action):
     """
     Apply black code formatter.
@@ -560,22 +707,31 @@ class _Black(_Action):
         return _check_exec(self._executable)
 
     def _execute(self, file_name: str, pedantic: int) -> List[str]:
+        return self._execute_batch([file_name], pedantic)
+
+    def _execute_batch(self, file_names: List[str], pedantic: int) -> List[str]:
         _ = pedantic
-        # Applicable to only python file.
-        if not is_py_file(file_name):
-            _LOG.debug("Skipping file_name='%s'", file_name)
+        # Applicable to only python files.
+        file_names = _select_py_files(file_names)
+        if not file_names:
             return []
         #
         opts = "--line-length 82"
-        cmd = self._executable + " %s %s" % (opts, file_name)
+        cmd = self._executable + " %s %s" % (opts, _quote_file_names(file_names))
         _, output = _tee(cmd, self._executable, abort_on_error=False)
         # Remove the lines:
         # - reformatted core/test/test_core.py
         # - 1 file reformatted.
         # - All done!
         # - 1 file left unchanged.
-        to_remove = ["All done!", "file left unchanged", "reformatted"]
-        output = [l for l in output if all(w not in l for w in to_remove)]
+        # - 1 file reformatted, 2 files left unchanged.
+        # but keep the ones reporting a failure, e.g.,
+        # - 2 files reformatted, 1 file failed to reformat.
+        output = [
+            l
+            for l in output
+            if not any(regex.match(l) for regex in _BLACK_SKIPPED_LINE_REGEXES)
+        ]
         return output
 
 
@@ -595,13 +751,16 @@ class _Isort(_Action):
         return _check_exec(self._executable)
 
     def _execute(self, file_name: str, pedantic: int) -> List[str]:
+        return self._execute_batch([file_name], pedantic)
+
+    def _execute_batch(self, file_names: List[str], pedantic: int) -> List[str]:
         _ = pedantic
-        # Applicable to only python file.
-        if not is_py_file(file_name):
-            _LOG.debug("Skipping file_name='%s'", file_name)
+        # Applicable to only python files.
+        file_names = _select_py_files(file_names)
+        if not file_names:
             return []
         #
-        cmd = self._executable + " %s" % file_name
+        cmd = self._executable + " %s" % _quote_file_names(file_names)
         _, output = _tee(cmd, self._executable, abort_on_error=False)
         return output
 
@@ -627,13 +786,17 @@ class _Flake8(_Action):
         return _check_exec(self._executable)
 
     def _execute(self, file_name: str, pedantic: int) -> List[str]:
+        return self._execute_batch([file_name], pedantic)
+
+    def _execute_batch(self, file_names: List[str], pedantic: int) -> List[str]:
         _ = pedantic
-        # Applicable to only python file.
-        if not is_py_file(file_name):
-            _LOG.debug("Skipping file_name='%s'", file_name)
+        # Applicable to only python files.
+        file_names = _select_py_files(file_names)
+        if not file_names:
             return []
-        # TODO(gp): Does -j 4 help?
-        opts = "--exit-zero --doctests --max-line-length=82 -j 4"
+        # Use a single process, since the linter already runs one worker per
+        # CPU (flake8 uses one process per CPU by default).
+        opts = "--exit-zero --doctests --max-line-length=82 -j 1"
         ignore = [
             # - "W503 line break before binary operator"
             #     - Disabled because in contrast with black formatting.
@@ -658,9 +821,11 @@ class _Flake8(_Action):
             # - E265 block comment should start with '# '
             "E265",
         ]
-        is_jupytext_code = is_paired_jupytext_file(file_name)
-        _LOG.debug("is_jupytext_code=%s", is_jupytext_code)
-        if is_jupytext_code:
+        jupytext_file_names = [
+            f for f in file_names if is_paired_jupytext_file(f)
+        ]
+        _LOG.debug("jupytext_file_names=%s", jupytext_file_names)
+        if jupytext_file_names:
             ignore.extend(
                 [
                     # E501 line too long.
@@ -668,17 +833,21 @@ class _Flake8(_Action):
                 ]
             )
         opts += " --ignore=" + ",".join(ignore)
-        cmd = self._executable + " %s %s" % (opts, file_name)
+        cmd = self._executable + " %s %s" % (opts, _quote_file_names(file_names))
         #
         _, output = _tee(cmd, self._executable, abort_on_error=True)
         # Remove some errors.
-        is_jupytext_code = is_paired_jupytext_file(file_name)
-        _LOG.debug("is_jupytext_code=%s", is_jupytext_code)
-        if is_jupytext_code:
+        if jupytext_file_names:
+            # Each line of the output starts with the name of the file.
+            jupytext_prefixes = tuple(f + ":" for f in jupytext_file_names)
             output_tmp: List[str] = []
             for line in output:
                 # F821 undefined name 'display' [flake8]
-                if "F821" in line and "undefined name 'display'" in line:
+                if (
+                    "F821" in line
+                    and "undefined name 'display'" in line
+                    and line.startswith(jupytext_prefixes)
+                ):
                     continue
                 output_tmp.append(line)
             output = output_tmp
@@ -688,6 +857,47 @@ class _Flake8(_Action):
 # #############################################################################
 
 
+# Separator between the location of a pydocstyle violation and its context
+# (e.g., "linter_v2.py:1 at module level:").
+# E.g., `linter_v2.py:1 at module level:`.
+_PYDOCSTYLE_LOCATION_REGEX = re.compile(r"^(\S+:\d+)(\s(at|in)\s.*)$")
+
+
+def _merge_pydocstyle_lines(lines: List[str]) -> List[str]:
+    """
+    Merge each location line of pydocstyle with the violation following it.
+
+    E.g., transform:
+        linter_v2.py:1 at module level:
+            D400: First line should end with a period (not ':')
+    into:
+        linter_v2.py:1: at module level: D400: First line should end with a
+        period (not ':')
+
+    The lines that are not part of a violation (e.g., `WARNING: Error in file
+    ...: Cannot parse file.`) are kept as they are.
+    """
+    output: List[str] = []
+    location = None
+    for line in lines:
+        if location is not None and line[:1].isspace():
+            # Merge the violation with its location.
+            output.append(location + line.lstrip())
+            location = None
+            continue
+        if location is not None:
+            # Keep a location without a violation as it is.
+            output.append(location)
+            location = None
+        if _PYDOCSTYLE_LOCATION_REGEX.match(line):
+            location = _PYDOCSTYLE_LOCATION_REGEX.sub(r"\1:\2", line)
+        elif line.strip() != "":
+            output.append(line)
+    if location is not None:
+        output.append(location)
+    return output
+
+
 class _Pydocstyle(_Action):
     def __init__(self) -> None:
         executable = "pydocstyle"
@@ -697,9 +907,12 @@ class _Pydocstyle(_Action):
         return _check_exec(self._executable)
 
     def _execute(self, file_name: str, pedantic: int) -> List[str]:
-        # Applicable to only python file.
-        if not is_py_file(file_name):
-            _LOG.debug("Skipping file_name='%s'", file_name)
+        return self._execute_batch([file_name], pedantic)
+
+    def _execute_batch(self, file_names: List[str], pedantic: int) -> List[str]:
+        # Applicable to only python files.
+        file_names = _select_py_files(file_names)
+        if not file_names:
             return []
         ignore = []
         # http://www.pydocstyle.org/en/2.1.1/error_codes.html
@@ -757,38 +970,13 @@ class _Pydocstyle(_Action):
         cmd = []
         cmd.append(self._executable)
         cmd.append(cmd_opts)
-        cmd.append(file_name)
+        cmd.append(_quote_file_names(file_names))
         cmd_as_str = " ".join(cmd)
         # We don't abort on error on pydocstyle, since it returns error if there
         # is any violation.
-        _, file_lines_as_str = hsystem.system_to_string(
-            cmd_as_str, abort_on_error=False
-        )
-        # Process lint_log transforming:
-        #   linter_v2.py:1 at module level:
-        #       D400: First line should end with a period (not ':')
-        # into:
-        #   linter_v2.py:1: at module level: D400: First line should end with a
-        #   period (not ':')
-        #
-        output: List[str] = []
-        #
-        file_lines = file_lines_as_str.split("\n")
-        lines = ["", ""]
-        for cnt, line in enumerate(file_lines):
-            line = line.rstrip("\n")
-            # _log.debug("line=%s", line)
-            if cnt % 2 == 0:
-                regex = r"(\s(at|in)\s)"
-                subst = r":\1"
-                line = re.sub(regex, subst, line)
-            else:
-                line = line.lstrip()
-            # _log.debug("-> line=%s", line)
-            lines[cnt % 2] = line
-            if cnt % 2 == 1:
-                line = "".join(lines)
-                output.append(line)
+        _, file_lines_as_str = _system_to_string(cmd_as_str, abort_on_error=False)
+        # Put each violation on a single line with its location.
+        output = _merge_pydocstyle_lines(file_lines_as_str.split("\n"))
         return output
 
 
@@ -827,17 +1015,43 @@ class _Pylint(_Action):
         return _check_exec(self._executable)
 
     def _execute(self, file_name: str, pedantic: int) -> List[str]:
-        # Applicable to only python file.
-        if not is_py_file(file_name):
-            _LOG.debug("Skipping file_name='%s'", file_name)
-            return []
-        #
-        is_test_code_tmp = is_under_test_dir(file_name)
-        _LOG.debug("is_test_code_tmp=%s", is_test_code_tmp)
-        #
-        is_jupytext_code = is_paired_jupytext_file(file_name)
-        _LOG.debug("is_jupytext_code=%s", is_jupytext_code)
-        #
+        return self._execute_batch([file_name], pedantic)
+
+    def _execute_batch(self, file_names: List[str], pedantic: int) -> List[str]:
+        # Applicable to only python files.
+        file_names = _select_py_files(file_names)
+        # Group the files requiring the same options, so that each group is
+        # processed with a single invocation.
+        file_names_by_type: Dict[Tuple[bool, bool], List[str]] = {}
+        for file_name in file_names:
+            is_test_code_tmp = is_under_test_dir(file_name)
+            is_jupytext_code = is_paired_jupytext_file(file_name)
+            key = (is_test_code_tmp, is_jupytext_code)
+            file_names_by_type.setdefault(key, []).append(file_name)
+        output: List[str] = []
+        for key, file_names_tmp in file_names_by_type.items():
+            is_test_code_tmp, is_jupytext_code = key
+            _LOG.debug(
+                "is_test_code_tmp=%s is_jupytext_code=%s",
+                is_test_code_tmp,
+                is_jupytext_code,
+            )
+            output_tmp = self._execute_files(
+                file_names_tmp, is_test_code_tmp, is_jupytext_code, pedantic
+            )
+            output.extend(output_tmp)
+        return output
+
+    def _execute_files(
+        self,
+        file_names: List[str],
+        is_test_code_tmp: bool,
+        is_jupytext_code: bool,
+        pedantic: int,
+    ) -> List[str]:
+        """
+        Run pylint on files requiring the same options.
+        """
         opts = []
         ignore = []
         if pedantic < 2:
@@ -939,6 +1153,16 @@ class _Pylint(_Action):
                     # "C0301",
                 ]
             )
+        # These checks are reported only across the files checked together, so
+        # they would depend on how the files are grouped.
+        ignore.extend(
+            [
+                # [R0401(cyclic-import), ] Cyclic import (a -> b)
+                "R0401",
+                # [R0801(duplicate-code), ] Similar lines in 2 files
+                "R0801",
+            ]
+        )
         if ignore:
             opts.append("--disable " + ",".join(ignore))
         # Allow short variables, as long as they are camel-case.
@@ -947,14 +1171,16 @@ class _Pylint(_Action):
         # TODO(gp): Not sure this is needed anymore.
         opts.append("--ignored-modules=pandas")
         opts.append("--output-format=parseable")
-        # TODO(gp): Does -j 4 help?
-        opts.append("-j 4")
+        # Use a single process (i.e., the default), since the linter already
+        # runs one worker per CPU.
         # pylint crashed due to lack of memory.
         # A fix according to https://github.com/PyCQA/pylint/issues/2388 is:
         opts.append('--init-hook="import sys; sys.setrecursionlimit(2000)"')
         _dassert_list_of_strings(opts)
         opts_as_str = " ".join(opts)
-        cmd = " ".join([self._executable, opts_as_str, file_name])
+        cmd = " ".join(
+            [self._executable, opts_as_str, _quote_file_names(file_names)]
+        )
         _, output = _tee(cmd, self._executable, abort_on_error=False)
         # Remove some errors.
         output_tmp: List[str] = []
@@ -965,7 +1191,7 @@ class _Pylint(_Action):
                     continue
             if line.startswith("Your code has been rated"):
                 # Your code has been rated at 10.00/10 (previous run: ...
-                line = file_name + ": " + line
+                line = " ".join(file_names) + ": " + line
             output_tmp.append(line)
         output = output_tmp
         # Remove lines.
@@ -985,6 +1211,45 @@ class _Pylint(_Action):
 # #############################################################################
 
 
+def _get_module_name(file_name: str) -> str:
+    """
+    Return the name of the module of a file, as computed by mypy.
+
+    E.g., `helpers/hdbg.py` -> `helpers.hdbg`, if `helpers` is a package.
+    """
+    dir_name, base_name = os.path.split(os.path.abspath(file_name))
+    module_names = []
+    if base_name != "__init__.py":
+        module_names.append(os.path.splitext(base_name)[0])
+    # Go up the dirs as long as they are packages.
+    while os.path.exists(os.path.join(dir_name, "__init__.py")):
+        dir_name, package_name = os.path.split(dir_name)
+        module_names.insert(0, package_name)
+    return ".".join(module_names)
+
+
+def _split_by_module_name(file_names: List[str]) -> List[List[str]]:
+    """
+    Split files into the fewest groups without two files of the same module.
+    """
+    file_names_groups: List[List[str]] = []
+    module_names_groups: List[Set[str]] = []
+    for file_name in file_names:
+        module_name = _get_module_name(file_name)
+        for file_names_group, module_names in zip(
+            file_names_groups, module_names_groups
+        ):
+            if module_name not in module_names:
+                break
+        else:
+            file_names_group, module_names = [], set()
+            file_names_groups.append(file_names_group)
+            module_names_groups.append(module_names)
+        file_names_group.append(file_name)
+        module_names.add(module_name)
+    return file_names_groups
+
+
 class _Mypy(_Action):
     def __init__(self) -> None:
         executable = "mypy"
@@ -994,19 +1259,49 @@ class _Mypy(_Action):
         return _check_exec(self._executable)
 
     def _execute(self, file_name: str, pedantic: int) -> List[str]:
-        _ = pedantic
-        # Applicable to only python files, that are not paired with notebooks.
-        if not is_py_file(file_name) or is_paired_jupytext_file(file_name):
-            _LOG.debug("Skipping file_name='%s'", file_name)
-            return []
+        return self._execute_batch([file_name], pedantic)
+
+    def _run_mypy(self, file_names: List[str]) -> List[str]:
+        """
+        Run mypy on files, checking them one at a time after a blocking error.
+        """
         # TODO(gp): Convert all these idioms into arrays and joins.
-        cmd = self._executable + " %s" % file_name
+        cmd = self._executable + " %s" % _quote_file_names(file_names)
         _, output = _tee(
             cmd,
             self._executable,
             # mypy returns -1 if there are errors.
             abort_on_error=False,
         )
+        # A blocking error in a file (e.g., a syntax error) prevents mypy from
+        # checking the other files, so each file is checked by itself.
+        is_blocked = any(
+            "errors prevented further checking" in line for line in output
+        )
+        if is_blocked and len(file_names) > 1:
+            _LOG.debug("Checking the files one at a time")
+            output = []
+            for file_name in file_names:
+                output.extend(self._run_mypy([file_name]))
+        return output
+
+    def _execute_batch(self, file_names: List[str], pedantic: int) -> List[str]:
+        _ = pedantic
+        # Applicable to only python files, that are not paired with notebooks.
+        file_names_tmp = []
+        for file_name in _select_py_files(file_names):
+            if is_paired_jupytext_file(file_name):
+                _LOG.debug("Skipping file_name='%s'", file_name)
+                continue
+            file_names_tmp.append(file_name)
+        file_names = file_names_tmp
+        if not file_names:
+            return []
+        # mypy stops checking if two files map to the same module, so they are
+        # checked in different invocations.
+        output: List[str] = []
+        for file_names_tmp in _split_by_module_name(file_names):
+            output.extend(self._run_mypy(file_names_tmp))
         # Remove some errors.
         output_tmp: List[str] = []
         for line in output:
@@ -1098,6 +1393,19 @@ def is_ipynb_file(file_name: str) -> bool:
     return file_name.endswith(".ipynb")
 
 
+def _select_py_files(file_names: List[str]) -> List[str]:
+    """
+    Return the python files among `file_names`.
+    """
+    file_names_out = []
+    for file_name in file_names:
+        if is_py_file(file_name):
+            file_names_out.append(file_name)
+        else:
+            _LOG.debug("Skipping file_name='%s'", file_name)
+    return file_names_out
+
+
 def from_python_to_ipynb_file(file_name: str) -> str:
     hdbg.dassert(is_py_file(file_name))
     ret = file_name.replace(".py", ".ipynb")
@@ -1110,18 +1418,21 @@ def from_ipynb_to_python_file(file_name: str) -> str:
     return ret
 
 
+# The pairing of the files doesn't change while linting, since the actions
+# only sync files that are already paired, so the result is memoized to avoid
+# checking the file system for each action.
+@functools.lru_cache(maxsize=None)
 def is_paired_jupytext_file(file_name: str) -> bool:
     """
     Return whether a file is a paired jupytext file.
     """
-    is_paired = (
-        is_py_file(file_name)
-        and os.path.exists(from_python_to_ipynb_file(file_name))
-        or (
-            is_ipynb_file(file_name)
-            and os.path.exists(from_ipynb_to_python_file(file_name))
-        )
-    )
+    # Replace only the extension and check the file system at most once.
+    if file_name.endswith(".py"):
+        is_paired = os.path.exists(file_name[: -len(".py")] + ".ipynb")
+    elif file_name.endswith(".ipynb"):
+        is_paired = os.path.exists(file_name[: -len(".ipynb")] + ".py")
+    else:
+        is_paired = False
     return is_paired
 
 
@@ -1171,6 +1482,15 @@ class _TestJupytext(_ProcessJupytext):
 # #############################################################################
 
 
+# Match `from ... import ...` and `import ... as ...` in a single pass.
+_IMPORT_REGEX = re.compile(
+    r"\s*(?:from\s+(?P<module>\S+)\s+import\s+.*"
+    r"|import\s+\S+\s+as\s+(?P<shortcut>\S+))"
+)
+# Match a separating line made of at least 6 chars, e.g., `# ######`.
+_SEPARATING_LINE_REGEX = re.compile(r"(\s*\#)\s*([\#\=\-\<\>]){6,}\s*$")
+
+
 class _CustomPythonChecks(_Action):
     # The maximum length of an 'import as'.
     MAX_LEN_IMPORT = 8
@@ -1205,30 +1525,31 @@ class _CustomPythonChecks(_Action):
             # In __init__.py we can import in weird ways (e.g., the
             # evil `from ... import *`).
             return msg
-        m = re.match(r"\s*from\s+(\S+)\s+import\s+.*", line)
-        if m:
-            if m.group(1) != "typing":
+        # Skip the regex on the lines that can't match it.
+        m = _IMPORT_REGEX.match(line) if "import" in line else None
+        if m is None:
+            return msg
+        if m.group("module") is not None:
+            if m.group("module") != "typing":
                 msg = "%s:%s: do not use '%s' use 'import foo.bar " "as fba'" % (
                     file_name,
                     line_num,
                     line.rstrip().lstrip(),
                 )
         else:
-            m = re.match(r"\s*import\s+\S+\s+as\s+(\S+)", line)
-            if m:
-                shortcut = m.group(1)
-                if len(shortcut) > _CustomPythonChecks.MAX_LEN_IMPORT:
-                    msg = (
-                        "%s:%s: the import shortcut '%s' in '%s' is longer than "
-                        "%s characters"
-                        % (
-                            file_name,
-                            line_num,
-                            shortcut,
-                            line.rstrip().lstrip(),
-                            _CustomPythonChecks.MAX_LEN_IMPORT,
-                        )
+            shortcut = m.group("shortcut")
+            if len(shortcut) > _CustomPythonChecks.MAX_LEN_IMPORT:
+                msg = (
+                    "%s:%s: the import shortcut '%s' in '%s' is longer than "
+                    "%s characters"
+                    % (
+                        file_name,
+                        line_num,
+                        shortcut,
+                        line.rstrip().lstrip(),
+                        _CustomPythonChecks.MAX_LEN_IMPORT,
                     )
+                )
         return msg
 
     @staticmethod
@@ -1306,11 +1627,9 @@ class _CustomPythonChecks(_Action):
             # Format separating lines.
             if _CustomPythonChecks.DEBUG:
                 _LOG.debug("* Format separating lines")
-            min_num_chars = 6
-            regex = r"(\s*\#)\s*([\#\=\-\<\>]){%d,}\s*$" % min_num_chars
             if _CustomPythonChecks.DEBUG:
-                _LOG.debug("regex=%s", regex)
-            m = re.match(regex, line)
+                _LOG.debug("regex=%s", _SEPARATING_LINE_REGEX.pattern)
+            m = _SEPARATING_LINE_REGEX.match(line) if "#" in line else None
             if m:
                 char = m.group(2)
                 line = m.group(1) + " " + char * (78 - len(m.group(1)))
@@ -1375,7 +1694,7 @@ class _LintMarkdown(_Action):
             return output
         # Run lint_txt.py.
         executable = "lint_txt.py"
-        exec_path = hgit.find_file_in_git_tree(executable)
+        exec_path = _find_file_in_git_tree(executable)
         hdbg.dassert_path_exists(exec_path)
         #
         cmd = []
@@ -1462,7 +1781,7 @@ _VALID_ACTIONS_META: List[Tuple[str, str, str, Type[_Action]]] = [
     # TODO(gp): Fix this.
     # Not installable through conda.
     # ("pyment", "w", "Create, update or convert docstring", _Pyment),
-    ("pylint", "w", "Check that module(s) satisfy a coding standard", _Pylint),
+    ("pylint", "r", "Check that module(s) satisfy a coding standard", _Pylint),
     ("mypy", "r", "Static code analyzer using the hint types", _Mypy),
     ("sync_jupytext", "w", "Create / sync jupytext files", _SyncJupytext),
     ("test_jupytext", "r", "Test jupytext files", _TestJupytext),
@@ -1478,14 +1797,18 @@ _VALID_ACTIONS_META: List[Tuple[str, str, str, Type[_Action]]] = [
 ]
 
 
-# joblib and caching with lru_cache don't get along, so we cache explicitly.
-_VALID_ACTIONS = None
+# Map each action to its meta information, to look up actions in constant
+# time.
+_VALID_ACTIONS_META_BY_NAME = {
+    action_meta[0]: action_meta for action_meta in _VALID_ACTIONS_META
+}
+hdbg.dassert_eq(len(_VALID_ACTIONS_META_BY_NAME), len(_VALID_ACTIONS_META))
+
+# Names of the actions in the order they are executed.
+_VALID_ACTIONS = tuple(_VALID_ACTIONS_META_BY_NAME)
 
 
 def _get_valid_actions() -> List[str]:
-    global _VALID_ACTIONS
-    if _VALID_ACTIONS is None:
-        _VALID_ACTIONS = list(zip(*_VALID_ACTIONS_META))[0]
     return _VALID_ACTIONS  # type: ignore
 
 
@@ -1497,19 +1820,29 @@ def _get_action_class(action: str) -> _Action:
     """
     Return the function corresponding to the passed string.
     """
-    res = None
-    for action_meta in _VALID_ACTIONS_META:
-        name, rw, comment, class_ = action_meta
-        _ = rw, comment
-        if name == action:
-            hdbg.dassert_is(res, None)
-            res = class_
-    hdbg.dassert_is_not(res, None)
-    # mypy gets confused since we are returning a class.
-    obj = res()  # type: ignore
+    hdbg.dassert_in(action, _VALID_ACTIONS_META_BY_NAME)
+    _, _, _, class_ = _VALID_ACTIONS_META_BY_NAME[action]
+    obj = class_()
     return obj
 
 
+def _split_actions(actions: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Split actions into the ones modifying the files and the read-only ones.
+
+    :return: the actions that modify the files and the read-only actions,
+        each in the order of `actions`
+    """
+    write_actions = [
+        a for a in actions if _VALID_ACTIONS_META_BY_NAME[a][1] == "w"
+    ]
+    read_actions = [
+        a for a in actions if _VALID_ACTIONS_META_BY_NAME[a][1] == "r"
+    ]
+    hdbg.dassert_eq(len(write_actions) + len(read_actions), len(actions))
+    return write_actions, read_actions
+
+
 def _remove_not_possible_actions(actions: List[str]) -> List[str]:
     """
     Check whether each action in "actions" can be executed and return a list of
@@ -1568,38 +1901,253 @@ def _test_actions() -> None:
         _LOG.info("All actions are possible")
 
 
+# #############################################################################
+# Cache.
+# #############################################################################
+
+# Actions whose output depends only on the content of the file they process
+# (e.g., not on the modules it imports), and thus can be cached.
+_CACHEABLE_ACTIONS = (
+    "basic_hygiene",
+    "compile_python",
+    "autoflake",
+    "isort",
+    "black",
+    "flake8",
+    "pydocstyle",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_linter_hash() -> str:
+    """
+    Return the hash of this script, which contains the options of the tools.
+    """
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# Config files of the tools.
+_TOOL_CONFIG_FILE_NAMES = (
+    ".flake8",
+    ".isort.cfg",
+    ".pydocstyle",
+    ".pylintrc",
+    "mypy.ini",
+    "pyproject.toml",
+    "setup.cfg",
+    "tox.ini",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tool_config_hash(dir_name: str) -> str:
+    """
+    Return the hash of the config files of the tools in a dir and its parents.
+
+    The tools look up their config files going up from the dir of each file
+    (e.g., isort, black) or from the current dir (e.g., pylint).
+
+    :param dir_name: absolute path of the dir
+    """
+    hash_ = hashlib.sha256()
+    parent_dir_name = os.path.dirname(dir_name)
+    if parent_dir_name != dir_name:
+        hash_.update(_get_tool_config_hash(parent_dir_name).encode())
+    for config_file_name in _TOOL_CONFIG_FILE_NAMES:
+        config_file_name = os.path.join(dir_name, config_file_name)
+        if os.path.exists(config_file_name):
+            hash_.update(config_file_name.encode())
+            hash_.update(b"\0")
+            hash_.update(_get_file_hash(config_file_name).encode())
+            hash_.update(b"\0")
+    return hash_.hexdigest()
+
+
+# Hash of the content of each file, together with the stat info of the file
+# when it was hashed.
+_FILE_HASHES: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+# Files modified within this interval from when they are hashed might be
+# modified again without a visible change of their modification time.
+_RACY_INTERVAL_IN_NS = 2 * 10**9
+
+
+def _get_file_hash(file_name: str) -> str:
+    """
+    Return the hash of the content of a file.
+
+    Like Git does with its index, the file is read and hashed again only if
+    its stat info (size, modification time, inode) changed since the last
+    time it was hashed. Files modified too close to when they are hashed are
+    not memoized, like the "racily clean" entries of the Git index.
+    """
+    stat = os.stat(file_name)
+    stat_info = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    if file_name in _FILE_HASHES:
+        stat_info_tmp, hash_ = _FILE_HASHES[file_name]
+        if stat_info_tmp == stat_info:
+            return hash_
+    hash_time_in_ns = time.time_ns()
+    with open(file_name, "rb") as f:
+        hash_ = hashlib.sha256(f.read()).hexdigest()
+    if stat.st_mtime_ns < hash_time_in_ns - _RACY_INTERVAL_IN_NS:
+        _FILE_HASHES[file_name] = (stat_info, hash_)
+    return hash_
+
+
+def _get_cache_file_name(
+    cache_dir: str, file_name: str, action: str, version: str, pedantic: int
+) -> str:
+    """
+    Return the file storing the output of an action on a file.
+
+    The file name is derived from the name and the content of the file, the
+    action and its options, the config files of the tools, and the version of
+    the executable. The name of the file is needed since the cached output
+    refers to the file by name, e.g., `dir/file.py:1: ...`. Whether the file
+    is paired with a notebook is needed since it changes the options of some
+    actions (e.g., flake8).
+    """
+    dir_name = os.path.dirname(os.path.abspath(file_name))
+    hash_ = hashlib.sha256()
+    for key in (
+        _get_linter_hash(),
+        _get_tool_config_hash(os.getcwd()),
+        _get_tool_config_hash(dir_name),
+        action,
+        version,
+        str(pedantic),
+        file_name,
+        str(is_paired_jupytext_file(file_name)),
+        _get_file_hash(file_name),
+    ):
+        hash_.update(key.encode())
+        hash_.update(b"\0")
+    cache_file_name = os.path.join(cache_dir, hash_.hexdigest() + ".json")
+    return cache_file_name
+
+
+def _write_cache_file(cache_file_name: str, output: List[str]) -> None:
+    """
+    Write the output of an action on a file in the cache.
+
+    The file is written under a temporary name and then renamed, since
+    multiple workers can write the same cache entry at the same time.
+    """
+    tmp_file_name = "%s.%s.tmp.json" % (
+        cache_file_name[: -len(".json")],
+        os.getpid(),
+    )
+    hio.to_json(tmp_file_name, {"output": output})
+    os.replace(tmp_file_name, cache_file_name)
+
+
+def _execute_with_cache(
+    action: str, file_names: List[str], pedantic: int, cache_dir: str
+) -> List[str]:
+    """
+    Execute an action on the files whose output is not cached.
+
+    The output of an action on a file is cached only if the action didn't
+    modify the file and the output is known to refer only to that file, so
+    that executing the action on the same file content is a no-op with the
+    same output.
+    """
+    class_ = _get_action_class(action)
+    version = class_.get_version()
+    if not version:
+        # The actions executed in-process (e.g., `py_compile`) depend on the
+        # Python interpreter.
+        version = sys.version
+    output: List[str] = []
+    cache_file_names = {}
+    for file_name in file_names:
+        cache_file_name = _get_cache_file_name(
+            cache_dir, file_name, action, version, pedantic
+        )
+        if os.path.exists(cache_file_name):
+            _LOG.debug("Using cached output for file_name='%s'", file_name)
+            output.extend(hio.from_json(cache_file_name)["output"])
+        else:
+            cache_file_names[file_name] = cache_file_name
+    if not cache_file_names:
+        return output
+    # Execute the action on the files that are not cached.
+    file_names = list(cache_file_names.keys())
+    output_tmp = class_.execute_batch(file_names, pedantic)
+    output.extend(output_tmp)
+    # Assign each line of the output to a file.
+    output_by_file: Dict[str, List[str]] = {f: [] for f in file_names}
+    for line in output_tmp:
+        file_name = next(
+            (f for f in file_names if line.startswith(f + ":")), None
+        )
+        if file_name is None:
+            # The output can't be split by file, so nothing can be cached.
+            _LOG.debug("Can't cache the output of action='%s'", action)
+            return output
+        output_by_file[file_name].append(line)
+    for file_name, cache_file_name in cache_file_names.items():
+        cache_file_name_after = _get_cache_file_name(
+            cache_dir, file_name, action, version, pedantic
+        )
+        if cache_file_name_after == cache_file_name:
+            _write_cache_file(cache_file_name, output_by_file[file_name])
+    return output
+
+
 # #############################################################################
 
 
 def _lint(
-    file_name: str, actions: List[str], pedantic: int, debug: bool
+    file_names: List[str],
+    actions: List[str],
+    pedantic: int,
+    debug: bool,
+    cache_dir: Optional[str] = None,
 ) -> List[str]:
     """
-    Execute all the actions on a filename.
+    Execute the actions in order on a group of files.
 
-    Note that this is the unit of parallelization, i.e., we run all the
-    actions on a single file to ensure that the actions are executed in
-    the proper order.
+    Note that this is the unit of parallelization: the actions modifying the
+    files are executed together on a group of files to ensure that they are
+    executed in the proper order on each file, while each read-only action
+    is executed separately. Each action processes all the files of the group
+    at once.
+
+    :param cache_dir: dir storing the output of the actions, to skip them
+        on files that haven't changed since the previous run. `None` to
+        disable caching
     """
     output: List[str] = []
-    _LOG.info("\n%s", hprint.frame(file_name, char1="="))
+    if _LOG.isEnabledFor(logging.INFO):
+        _LOG.info("\n%s", hprint.frame(_list_to_str(file_names), char1="="))
     for action in actions:
-        _LOG.debug("\n%s", hprint.frame(action, char1="-"))
-        _print("## %-20s (%s)" % (action, file_name))
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug("\n%s", hprint.frame(action, char1="-"))
+        _print("## %-20s (%s)" % (action, _list_to_str(file_names)))
         if debug:
             # Make a copy after each action.
-            dst_file_name = file_name + "." + action
-            cmd = "cp -a %s %s" % (file_name, dst_file_name)
-            os.system(cmd)
+            dst_file_names = []
+            for file_name in file_names:
+                dst_file_name = file_name + "." + action
+                cmd = "cp -a %s %s" % (file_name, dst_file_name)
+                os.system(cmd)
+                dst_file_names.append(dst_file_name)
         else:
-            dst_file_name = file_name
-        class_ = _get_action_class(action)
+            dst_file_names = file_names
         # We want to run the stages, and not check.
-        output_tmp = class_.execute(dst_file_name, pedantic)
+        if cache_dir is not None and action in _CACHEABLE_ACTIONS:
+            output_tmp = _execute_with_cache(
+                action, dst_file_names, pedantic, cache_dir
+            )
+        else:
+            class_ = _get_action_class(action)
+            output_tmp = class_.execute_batch(dst_file_names, pedantic)
         # Annotate with executable [tag].
         output_tmp = _annotate_output(output_tmp, action)
         _dassert_list_of_strings(
-            output_tmp, "action=%s file_name=%s", action, file_name
+            output_tmp, "action=%s file_names=%s", action, file_names
         )
         output.extend(output_tmp)
         if output_tmp:
@@ -1607,6 +2155,12 @@ def _lint(
     return output
 
 
+# Read-only actions that are cheap and executed in-process (e.g., compiling with
+# `py_compile`), so they are run by the parent process while the workers execute
+# the other actions, instead of being dispatched to a worker.
+_PARENT_ACTIONS = ("compile_python",)
+
+
 def _run_linter(
     actions: List[str], args: argparse.Namespace, file_names: List[str]
 ) -> List[str]:
@@ -1627,32 +2181,94 @@ def _run_linter(
             "Using num_threads='%s' since there is a single file", num_threads
         )
     output: List[str] = []
+    if not file_names:
+        return output
+    # The read-only actions are executed after all the actions modifying the
+    # files, so that they check the final version of the files.
+    write_actions, read_actions = _split_actions(actions)
     if num_threads == "serial":
-        for file_name in file_names:
-            output_tmp = _lint(file_name, actions, pedantic, args.debug)
+        output_tmp = _lint(
+            file_names,
+            write_actions + read_actions,
+            pedantic,
+            args.debug,
+            cache_dir=args.cache_dir,
+        )
+        output.extend(output_tmp)
     else:
         num_threads = int(num_threads)
-        # -1 is interpreted by joblib like for all cores.
+        # A non-positive number of threads is interpreted as all cores.
         _LOG.info(
             "Using %s threads", num_threads if num_threads > 0 else "all CPUs"
         )
-        import joblib
-
-        output_tmp = joblib.Parallel(n_jobs=num_threads, verbose=50)(
-            joblib.delayed(_lint)(file_name, actions, pedantic, args.debug)
-            for file_name in file_names
+        num_workers = num_threads if num_threads > 0 else os.cpu_count() or 1
+        # Split the files in one group per worker, so that each action is
+        # executed once per group.
+        num_groups = min(num_workers, len(file_names))
+        file_names_groups = hlist.chunk(file_names, num_groups)
+        lint_func = functools.partial(
+            _lint, pedantic=pedantic, debug=args.debug, cache_dir=args.cache_dir
         )
-        output_tmp = list(itertools.chain.from_iterable(output_tmp))
-    output.extend(output_tmp)
+        output_by_group: Dict[int, List[str]] = {
+            idx: [] for idx in range(num_groups)
+        }
+        # Don't start more processes than tasks that can run at the same time,
+        # i.e., one task per group and read-only action run by the workers.
+        num_worker_actions = len(
+            [action for action in read_actions if action not in _PARENT_ACTIONS]
+        )
+        num_workers = min(num_workers, num_groups * max(num_worker_actions, 1))
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers
+        ) as executor:
+            # Execute the actions modifying the files in order on each group.
+            future_to_idx = {
+                executor.submit(lint_func, file_names_group, write_actions): idx
+                for idx, file_names_group in enumerate(file_names_groups)
+            }
+            # Once a group has been modified, execute each read-only action on
+            # it as an independent task, so that slow actions (e.g., pylint)
+            # are spread across the workers.
+            read_futures: List[
+                Tuple[int, "concurrent.futures.Future[List[str]]"]
+            ] = []
+            for future in concurrent.futures.as_completed(future_to_idx):
+                idx = future_to_idx[future]
+                output_by_group[idx].extend(future.result())
+                group_futures: Dict[str, concurrent.futures.Future] = {}
+                for action in read_actions:
+                    if action not in _PARENT_ACTIONS:
+                        group_futures[action] = executor.submit(
+                            lint_func, file_names_groups[idx], [action]
+                        )
+                for action in read_actions:
+                    if action in _PARENT_ACTIONS:
+                        group_futures[action] = concurrent.futures.Future()
+                        group_futures[action].set_result(
+                            lint_func(file_names_groups[idx], [action])
+                        )
+                # Keep the output of the actions in the order they are run.
+                read_futures.extend(
+                    (idx, group_futures[action]) for action in read_actions
+                )
+            for idx, read_future in read_futures:
+                output_by_group[idx].extend(read_future.result())
+        # Keep the output grouped by files, releasing each group once copied.
+        for idx in range(num_groups):
+            output.extend(output_by_group.pop(idx))
     output = hprint.remove_empty_lines_from_string_list(output)
     return output  # type: ignore
 
 
+# E.g., `dev_scripts/linter.py:493: ... [pydocstyle]`.
+_LINT_REGEX = re.compile(r"\S+:\d+.*\[\S+\]")
+
+
 def _count_lints(lints: List[str]) -> int:
     num_lints = 0
     for line in lints:
-        # dev_scripts/linter.py:493: ... [pydocstyle]
-        if re.match(r"\S+:\d+.*\[\S+\]", line):
+        # Skip the regex on the lines that can't match it.
+        if "[" in line and ":" in line and _LINT_REGEX.match(line):
             num_lints += 1
     _LOG.info("num_lints=%d", num_lints)
     return num_lints
@@ -1679,11 +2295,20 @@ def _main(args: argparse.Namespace) -> int:
     _LOG.info("# Found %d files to process", len(all_file_names))
     # Select files.
     file_names = _get_files_to_lint(args, all_file_names)
-    _LOG.info(
-        "\n%s\n%s",
-        hprint.frame("# Found %d files to lint:" % len(file_names)),
-        hprint.indent("\n".join(file_names)),
-    )
+    # Build the list of files only if it's logged, showing only the first
+    # files since the list can be long (e.g., with `--dir_name`).
+    if _LOG.isEnabledFor(logging.INFO):
+        max_num_files = 50
+        file_names_to_log = file_names[:max_num_files]
+        if len(file_names) > max_num_files:
+            file_names_to_log.append(
+                "... (%d more)" % (len(file_names) - max_num_files)
+            )
+        _LOG.info(
+            "\n%s\n%s",
+            hprint.frame("# Found %d files to lint:" % len(file_names)),
+            hprint.indent("\n".join(file_names_to_log)),
+        )
     if args.collect_only:
         _LOG.warning("Exiting as requested")
         sys.exit(0)
@@ -1691,8 +2316,9 @@ def _main(args: argparse.Namespace) -> int:
     actions = _select_actions(args)
     all_actions = actions[:]
     _LOG.debug("actions=%s", actions)
-    # Create tmp dir.
-    hio.create_dir(_TMP_DIR, incremental=False)
+    # Create tmp dir. The linter doesn't write any file in it, so a dir left
+    # over by a run with `--no_cleanup` can be reused without emptying it.
+    hio.create_dir(_TMP_DIR, incremental=True)
     _LOG.info("tmp_dir='%s'", _TMP_DIR)
     # Check the files.
     lints: List[str] = []
@@ -1721,11 +2347,11 @@ def _main(args: argparse.Namespace) -> int:
     # Write the file.
     output_as_str = "\n".join(output)
     hio.to_file(args.linter_log, output_as_str)
-    # Print linter output.
-    txt = hio.from_file(args.linter_log)
-    _print(hprint.frame(args.linter_log, char1="/").rstrip("\n"))
-    _print(txt + "\n")
-    _print(hprint.line(char="/").rstrip("\n"))
+    # Print linter output, without reading back the file just written.
+    if not NO_PRINT:
+        _print(hprint.frame(args.linter_log, char1="/").rstrip("\n"))
+        _print(output_as_str + "\n")
+        _print(hprint.line(char="/").rstrip("\n"))
     #
     if num_lints != 0:
         _LOG.warning(
@@ -1827,6 +2453,13 @@ def _parse() -> argparse.ArgumentParser:
         "--no_cleanup", action="store_true", help="Do not clean up tmp files"
     )
     parser.add_argument("--jenkins", action="store_true", help="Run as jenkins")
+    parser.add_argument(
+        "--cache_dir",
+        action="store",
+        default=None,
+        help="Cache the output of the actions in this dir across runs, to skip "
+        "the actions on files that haven't changed",
+    )
     # Test.
     parser.add_argument(
         "--collect_only",
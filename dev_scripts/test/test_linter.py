@@ -0,0 +1,186 @@
+import logging
+import os
+import shutil
+
+import pytest
+
+import dev_scripts.old.linter.linter as dsollili
+import helpers.hio as hio
+import helpers.hunit_test as hunitest
+
+_LOG = logging.getLogger(__name__)
+
+# pylint: disable=protected-access
+
+
+@pytest.mark.skipif(
+    shutil.which("flake8") is None, reason="flake8 is not installed"
+)
+class Test_execute_with_cache1(hunitest.TestCase):
+    def test_same_content1(self) -> None:
+        """
+        Check that files with the same content are reported with their name.
+        """
+        scratch_dir = self.get_scratch_space()
+        cache_dir = os.path.join(scratch_dir, "cache")
+        file_names = []
+        for dir_name in ("dir1", "dir2"):
+            file_name = os.path.join(scratch_dir, dir_name, "file.py")
+            hio.to_file(file_name, "import os\n")
+            file_names.append(file_name)
+        for file_name in file_names:
+            # The second run uses the cached output.
+            for _ in range(2):
+                output = dsollili._execute_with_cache(
+                    "flake8", [file_name], 0, cache_dir
+                )
+                self.assertEqual(len(output), 1, msg=str(output))
+                self.assertTrue(
+                    output[0].startswith(file_name + ":1:1: F401"),
+                    msg=output[0],
+                )
+        # Check that there is one cache entry per file.
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+
+class Test_get_cache_file_name1(hunitest.TestCase):
+    def test_config_file1(self) -> None:
+        """
+        Check that a config file in the dir of a file changes its cache entry.
+        """
+        scratch_dir = self.get_scratch_space()
+        cache_dir = os.path.join(scratch_dir, "cache")
+        file_name = os.path.join(scratch_dir, "dir1", "file.py")
+        hio.to_file(file_name, "import os\n")
+        cache_file_name1 = dsollili._get_cache_file_name(
+            cache_dir, file_name, "flake8", "", 0
+        )
+        # Add a config file next to the file.
+        config_file_name = os.path.join(scratch_dir, "dir1", "setup.cfg")
+        hio.to_file(config_file_name, "[flake8]\nignore = F401\n")
+        dsollili._get_tool_config_hash.cache_clear()
+        cache_file_name2 = dsollili._get_cache_file_name(
+            cache_dir, file_name, "flake8", "", 0
+        )
+        self.assertNotEqual(cache_file_name1, cache_file_name2)
+
+    def test_paired_notebook1(self) -> None:
+        """
+        Check that pairing a file with a notebook changes its cache entry.
+        """
+        scratch_dir = self.get_scratch_space()
+        cache_dir = os.path.join(scratch_dir, "cache")
+        file_name = os.path.join(scratch_dir, "file.py")
+        hio.to_file(file_name, "import os\n")
+        cache_file_name1 = dsollili._get_cache_file_name(
+            cache_dir, file_name, "flake8", "", 0
+        )
+        # Add the paired notebook.
+        hio.to_file(os.path.join(scratch_dir, "file.ipynb"), "{}")
+        dsollili.is_paired_jupytext_file.cache_clear()
+        cache_file_name2 = dsollili._get_cache_file_name(
+            cache_dir, file_name, "flake8", "", 0
+        )
+        self.assertNotEqual(cache_file_name1, cache_file_name2)
+
+
+class Test_merge_pydocstyle_lines1(hunitest.TestCase):
+    def test_unparsable_file1(self) -> None:
+        """
+        Check that an unparsable file doesn't shift the following violations.
+        """
+        lines = [
+            "WARNING: Error in file broken.py: Cannot parse file.",
+            "nodoc.py:1 at module level:",
+            "        D100: Missing docstring in public module",
+            "nodoc.py:4 in public function `g`:",
+            "        D103: Missing docstring in public function",
+            "",
+        ]
+        act = dsollili._merge_pydocstyle_lines(lines)
+        exp = [
+            "WARNING: Error in file broken.py: Cannot parse file.",
+            "nodoc.py:1: at module level:D100: Missing docstring in public"
+            " module",
+            "nodoc.py:4: in public function `g`:D103: Missing docstring in public"
+            " function",
+        ]
+        self.assert_equal("\n".join(act), "\n".join(exp))
+        # Check that the violations are counted as lints.
+        num_lints = dsollili._count_lints(
+            [line + " [pydocstyle]" for line in act]
+        )
+        self.assertEqual(num_lints, 2)
+
+
+class Test_split_by_module_name1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check that files of the same module are in different groups.
+        """
+        scratch_dir = self.get_scratch_space()
+        file_names = []
+        for file_name in ("dir1/file.py", "dir2/file.py", "dir1/file2.py"):
+            file_name = os.path.join(scratch_dir, file_name)
+            hio.to_file(file_name, "")
+            file_names.append(file_name)
+        act = dsollili._split_by_module_name(file_names)
+        exp = [[file_names[0], file_names[2]], [file_names[1]]]
+        self.assertEqual(act, exp)
+
+
+@pytest.mark.skipif(shutil.which("mypy") is None, reason="mypy is not installed")
+class Test_Mypy1(hunitest.TestCase):
+    def test_syntax_error1(self) -> None:
+        """
+        Check that a file with a syntax error doesn't hide the other lints.
+        """
+        scratch_dir = self.get_scratch_space()
+        file_name1 = os.path.join(scratch_dir, "file1.py")
+        hio.to_file(file_name1, "def f(:\n")
+        file_name2 = os.path.join(scratch_dir, "file2.py")
+        hio.to_file(file_name2, 'a: int = "a"\n')
+        output = dsollili._Mypy().execute_batch([file_name1, file_name2], 0)
+        self.assertTrue(
+            any("file1.py:" in line for line in output),
+            msg=str(output),
+        )
+        self.assertTrue(
+            any("file2.py:" in line for line in output),
+            msg=str(output),
+        )
+
+
+@pytest.mark.skipif(
+    shutil.which("black") is None, reason="black is not installed"
+)
+class Test_Black1(hunitest.TestCase):
+    def test_failure1(self) -> None:
+        """
+        Check that the summary of a failed run is reported.
+        """
+        scratch_dir = self.get_scratch_space()
+        file_name1 = os.path.join(scratch_dir, "file1.py")
+        hio.to_file(file_name1, "def f(:\n")
+        file_name2 = os.path.join(scratch_dir, "file2.py")
+        hio.to_file(file_name2, "a=1\n")
+        output = dsollili._Black().execute_batch([file_name1, file_name2], 0)
+        self.assertTrue(
+            any("failed to reformat" in line for line in output),
+            msg=str(output),
+        )
+        self.assertFalse(
+            any(line.startswith("reformatted ") for line in output),
+            msg=str(output),
+        )
+
+    def test_file_name_with_space1(self) -> None:
+        """
+        Check that a file name containing a space is passed as one argument.
+        """
+        scratch_dir = self.get_scratch_space()
+        file_name = os.path.join(scratch_dir, "file 1.py")
+        hio.to_file(file_name, "a=1\n")
+        output = dsollili._Black().execute_batch([file_name], 0)
+        self.assertEqual(output, [])
+        self.assertEqual(hio.from_file(file_name), "a = 1\n")
@@ -429,8 +429,12 @@ def to_file(
         f = open(  # pylint: disable=consider-using-with
             file_name, mode, buffering=buffering
         )
-    # Write file contents.
-    f.writelines(lines)
+    # Write file contents. A string is written at once, since `writelines()`
+    # would write it one char at a time.
+    if isinstance(lines, str):
+        f.write(lines)
+    else:
+        f.writelines(lines)
     f.close()
     # Clear internal buffer of the file.
     if force_flush:
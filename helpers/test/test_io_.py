@@ -45,6 +45,28 @@ class Test_change_filename_extension1(hunitest.TestCase):
         self.assert_equal(actual, expected)
 
 
+class Test_to_file1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check that a string is written and read back unchanged.
+        """
+        file_name = os.path.join(self.get_scratch_space(), "test.txt")
+        txt = "line 1\nline 2\n\nline 4"
+        hio.to_file(file_name, txt)
+        actual = hio.from_file(file_name)
+        self.assert_equal(actual, txt)
+
+    def test2(self) -> None:
+        """
+        Check that a list of lines is written as with `writelines()`.
+        """
+        file_name = os.path.join(self.get_scratch_space(), "test.txt")
+        lines = ["line 1\n", "line 2\n"]
+        hio.to_file(file_name, lines)  # type: ignore[arg-type]
+        actual = hio.from_file(file_name)
+        self.assert_equal(actual, "line 1\nline 2\n")
+
+
 class Test_load_df_from_json(hunitest.TestCase):
     def test1(self) -> None:
         test_json_path = os.path.join(self.get_input_dir(), "test.json")